@@ -8,6 +8,7 @@ import pandas as pd
 import numpy as np
 import pickle
 import os
+import sys
 import warnings
 import matplotlib
 matplotlib.use("Agg")
@@ -15,6 +16,15 @@ import matplotlib.pyplot as plt
 
 warnings.filterwarnings("ignore")
 
+# Make project packages (pricing/) importable when run via `streamlit run app/app.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pricing import ComparablesIndex, calibrate_intervals, dashboard, predict_with_interval
+import telemetry
+
+# Opt-in metrics export / profiling (METRICS_ENABLED, METRICS_PORT, METRICS_JSONL, METRICS_PROFILE)
+telemetry.configure_from_env()
+telemetry.start_profiler_from_env()
+
 
 # Configuration & styling
 st.set_page_config(
@@ -65,21 +75,32 @@ LOCATION_COORDS = {
 def load_artifacts():
     base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     model_path = os.path.join(base, "data", "model.pkl")
+    telemetry.inc("app_cache_misses_total", labels={"cache": "artifacts"})
     try:
-        with open(model_path, "rb") as f:
-            return pickle.load(f)
+        with telemetry.timer("app_data_load_seconds", {"source": "model.pkl"}), open(model_path, "rb") as f:
+            artifact = pickle.load(f)
     except FileNotFoundError:
         st.error(f"Model not found at `{model_path}`. Run Day 4 script first.")
         return None
+    if "intervals" not in artifact:
+        # Older artifacts: calibrate intervals on the model's own held-out split
+        df_path = os.path.join(base, "data", "clean_listings.csv")
+        if os.path.exists(df_path):
+            artifact["intervals"] = calibrate_intervals(artifact, pd.read_csv(df_path))
+    return artifact
 
 
-@st.cache_data
-def load_location_stats():
+@st.cache_data(max_entries=1)
+def load_location_stats(version=None):
+    """Median price per location (reloaded when `version` changes)."""
     base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     df_path = os.path.join(base, "data", "clean_listings.csv")
+    telemetry.inc("app_cache_misses_total", labels={"cache": "location_stats"})
     try:
-        df = pd.read_csv(df_path)
-        return df.groupby("location")["price_kes"].median().sort_values(ascending=False)
+        with telemetry.timer("app_data_load_seconds", {"source": "clean_listings.csv"}):
+            df = pd.read_csv(df_path)
+        with telemetry.timer("app_aggregate_seconds", {"view": "location_stats"}):
+            return df.groupby("location")["price_kes"].median().sort_values(ascending=False)
     except FileNotFoundError:
         return None
 
@@ -88,29 +109,46 @@ def load_location_stats():
 def load_model_comparison():
     base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     path = os.path.join(base, "data", "model_comparison.csv")
+    telemetry.inc("app_cache_misses_total", labels={"cache": "model_comparison"})
     try:
-        return pd.read_csv(path)
+        with telemetry.timer("app_data_load_seconds", {"source": "model_comparison.csv"}):
+            return pd.read_csv(path)
     except FileNotFoundError:
         return None
 
 
-@st.cache_data
-def load_listings_count():
+@st.cache_data(max_entries=1)
+def load_listings_count(version=None):
+    """Number of clean listings (reloaded when `version` changes)."""
     base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     path = os.path.join(base, "data", "clean_listings.csv")
+    telemetry.inc("app_cache_misses_total", labels={"cache": "listings_count"})
     try:
-        return len(pd.read_csv(path))
+        with telemetry.timer("app_data_load_seconds", {"source": "clean_listings.csv"}):
+            return len(pd.read_csv(path))
     except FileNotFoundError:
         return 0
 
 
-@st.cache_data
-def load_dashboard_data():
-    """Load full clean listings for Day 6 dashboard."""
+def clean_listings_version():
+    """Modification time of clean_listings.csv (None if missing); keys cached loads."""
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = os.path.join(base, "data", "clean_listings.csv")
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+@st.cache_data(max_entries=1)
+def load_dashboard_data(version=None):
+    """Load full clean listings for Day 6 dashboard (reloaded when `version` changes)."""
     base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     path = os.path.join(base, "data", "clean_listings.csv")
+    telemetry.inc("app_cache_misses_total", labels={"cache": "dashboard_data"})
     try:
-        df = pd.read_csv(path)
+        with telemetry.timer("app_data_load_seconds", {"source": "clean_listings.csv"}):
+            df = pd.read_csv(path)
         if "listing_date" in df.columns:
             df["listing_date"] = pd.to_datetime(df["listing_date"], errors="coerce")
         if "month" in df.columns:
@@ -120,6 +158,31 @@ def load_dashboard_data():
         return None
 
 
+@st.cache_resource
+def load_comparables_index():
+    """Nearest-neighbour index over clean listings, shared across sessions."""
+    telemetry.inc("app_cache_misses_total", labels={"cache": "comparables_index"})
+    return ComparablesIndex()
+
+
+def get_comparables_index():
+    """Return the comparables index, synced with the latest clean listings."""
+    version = clean_listings_version()
+    df = cached("dashboard_data", lambda: load_dashboard_data(version))
+    if df is None or len(df) == 0:
+        return None
+    index = cached("comparables_index", load_comparables_index)
+    with telemetry.timer("comparables_sync_seconds"):
+        index.sync(df, version=version)
+    return index
+
+
+def cached(name, loader):
+    """Call a Streamlit-cached loader, timing the lookup (cache hits = lookups - misses)."""
+    with telemetry.timer("app_cache_lookup_seconds", {"cache": name}):
+        return loader()
+
+
 def get_top_drivers_from_model(artifact):
     """Derive top 5 price drivers from trained model feature importances."""
     model = artifact["model"]
@@ -140,9 +203,9 @@ def format_price(median_kes):
     return f"KES {median_kes:,.0f}"
 
 
-artifact = load_artifacts()
-location_medians = load_location_stats()
-comparison_df = load_model_comparison()
+artifact = cached("artifacts", load_artifacts)
+location_medians = cached("location_stats", lambda: load_location_stats(clean_listings_version()))
+comparison_df = cached("model_comparison", load_model_comparison)
 
 if artifact is None:
     st.stop()
@@ -165,7 +228,7 @@ else:
     MAE = 131_812  # fallback
     best_model_display = model_name
     best_r2 = 0.23
-n_listings = load_listings_count()
+n_listings = cached("listings_count", lambda: load_listings_count(clean_listings_version()))
 
 top_drivers = get_top_drivers_from_model(artifact)
 
@@ -257,16 +320,24 @@ if nav == "Predict Price":
                     columns=feature_cols,
                 )
 
-                if use_scaler and scaler is not None:
-                    X = scaler.transform(X)
-
-                pred_price = float(np.clip(model.predict(X), 0, None)[0])
-                lower = max(0, pred_price - MAE)
-                upper = pred_price + MAE
+                if "intervals" in artifact and not artifact["intervals"].get("stale"):
+                    # Per-listing interval from conformal residuals (by location & price level)
+                    pred, lower_arr, upper_arr = predict_with_interval(artifact, X)
+                    pred_price, lower, upper = float(pred[0]), float(lower_arr[0]), float(upper_arr[0])
+                    range_note = f"{1 - artifact['intervals']['alpha']:.0%} interval for similar listings"
+                else:
+                    # No calibration (or stale after an incremental refresh): global ± MAE band
+                    if use_scaler and scaler is not None:
+                        X = scaler.transform(X)
+                    with telemetry.timer("model_predict_seconds"):
+                        pred_price = float(np.clip(model.predict(X), 0, None)[0])
+                    lower = max(0, pred_price - MAE)
+                    upper = pred_price + MAE
+                    range_note = "± MAE"
 
                 st.success("Prediction complete!")
                 st.metric("Estimated Price", format_price(pred_price))
-                st.caption(f"**Expected range:** {format_price(lower)} – {format_price(upper)} (± MAE)")
+                st.caption(f"**Expected range:** {format_price(lower)} – {format_price(upper)} ({range_note})")
 
                 # Explainability
                 st.subheader("What's driving this price?")
@@ -282,6 +353,38 @@ if nav == "Predict Price":
 
                 st.info("\n\n".join(driver_text))
 
+                # Comparable listings
+                comp_index = get_comparables_index()
+                if comp_index is not None:
+                    with telemetry.timer("comparables_query_seconds"):
+                        comps = comp_index.query(
+                            {
+                                "location": location,
+                                "bedrooms": bedrooms,
+                                "bathrooms": bathrooms,
+                                "size_sqft": size_sqft,
+                                "amenity_score": amenity_score,
+                                "has_parking": has_parking,
+                                "has_pool": has_pool,
+                                "has_gym": has_gym,
+                                "has_security": has_security,
+                                "has_garden": has_garden,
+                                "is_land": is_land,
+                            },
+                            k=5,
+                        )
+                    st.subheader("Comparable listings")
+                    st.caption(f"Median of {len(comps)} most similar listings: {format_price(comps['price_kes'].median())}")
+                    st.dataframe(
+                        comps.style.format({
+                            "size_sqft": "{:,.0f}",
+                            "price_kes": "{:,.0f}",
+                            "similarity": "{:.2f}",
+                        }, na_rep="—"),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+
             except Exception as e:
                 st.error(f"Prediction failed: {e}")
 
@@ -346,7 +449,7 @@ elif nav == "Dashboard":
     st.markdown("Business story at a glance: location, trends, price per sqft, and amenity impact.")
     st.divider()
 
-    df_dash = load_dashboard_data()
+    df_dash = cached("dashboard_data", lambda: load_dashboard_data(clean_listings_version()))
     if df_dash is None or len(df_dash) == 0:
         st.warning("No dashboard data. Ensure `data/clean_listings.csv` exists.")
     else:
@@ -359,7 +462,8 @@ elif nav == "Dashboard":
 
         with tab1:
             st.subheader("Median price by location")
-            loc_med = df_dash.groupby("location")["price_kes"].median().sort_values(ascending=True)
+            with telemetry.timer("app_aggregate_seconds", {"view": "location_median"}):
+                loc_med = dashboard.location_medians(df_dash)
             top_n = st.slider("Number of locations to show", 5, min(30, len(loc_med)), 15, key="tab1_n")
             plot_locs = loc_med.tail(top_n)
             fig, ax = plt.subplots(figsize=(8, max(4, top_n * 0.35)))
@@ -369,7 +473,8 @@ elif nav == "Dashboard":
             ax.set_xlabel("Median price (KES)")
             ax.set_title("Median listing price by location")
             plt.tight_layout()
-            st.pyplot(fig)
+            with telemetry.timer("app_render_seconds", {"figure": "location_median"}):
+                st.pyplot(fig)
             plt.close()
             with st.expander("View table"):
                 st.dataframe(
@@ -381,11 +486,8 @@ elif nav == "Dashboard":
         with tab2:
             st.subheader("Monthly price trend")
             if "month" in df_dash.columns and df_dash["month"].notna().any():
-                monthly = df_dash.groupby("month").agg(
-                    median_price=("price_kes", "median"),
-                    count=("price_kes", "count"),
-                ).reset_index()
-                monthly = monthly.sort_values("month")
+                with telemetry.timer("app_aggregate_seconds", {"view": "monthly_trend"}):
+                    monthly = dashboard.monthly_trend(df_dash)
                 fig, ax = plt.subplots(figsize=(8, 4))
                 ax.plot(monthly["month"], monthly["median_price"], marker="o", color="steelblue", linewidth=2)
                 ax.set_xlabel("Month")
@@ -393,7 +495,8 @@ elif nav == "Dashboard":
                 ax.set_title("Monthly median price trend")
                 ax.grid(True, alpha=0.3)
                 plt.tight_layout()
-                st.pyplot(fig)
+                with telemetry.timer("app_render_seconds", {"figure": "monthly_trend"}):
+                    st.pyplot(fig)
                 plt.close()
                 st.caption(f"Listings per month: {monthly.set_index('month')['count'].to_dict()}")
             else:
@@ -407,15 +510,12 @@ elif nav == "Dashboard":
 
         with tab3:
             st.subheader("Price per sqft comparison")
-            # Exclude land and invalid price_per_sqft for comparison
-            df_sqft = df_dash[df_dash["is_land"] != 1].copy()
-            df_sqft = df_sqft[df_sqft["price_per_sqft"].notna() & (df_sqft["price_per_sqft"] > 0)]
-            # Cap extreme outliers for visualization (e.g. 99th percentile)
-            cap = df_sqft["price_per_sqft"].quantile(0.99)
-            df_sqft = df_sqft[df_sqft["price_per_sqft"] <= cap]
+            # Exclude land and invalid price_per_sqft, cap extreme outliers (99th percentile)
+            df_sqft = dashboard.price_per_sqft_frame(df_dash)
             compare_by = st.radio("Compare by", ["location", "property_type"], horizontal=True, key="tab3_by")
             if len(df_sqft) > 0:
-                sqft_med = df_sqft.groupby(compare_by)["price_per_sqft"].median().sort_values(ascending=True)
+                with telemetry.timer("app_aggregate_seconds", {"view": "price_per_sqft"}):
+                    sqft_med = dashboard.price_per_sqft_medians(df_sqft, compare_by)
                 top_n_sqft = st.slider("Number to show", 5, min(25, len(sqft_med)), 12, key="tab3_n")
                 plot_sqft = sqft_med.tail(top_n_sqft)
                 fig, ax = plt.subplots(figsize=(8, max(4, len(plot_sqft) * 0.35)))
@@ -425,7 +525,8 @@ elif nav == "Dashboard":
                 ax.set_xlabel("Median price per sqft (KES)")
                 ax.set_title(f"Price per sqft by {compare_by.replace('_', ' ')}")
                 plt.tight_layout()
-                st.pyplot(fig)
+                with telemetry.timer("app_render_seconds", {"figure": "price_per_sqft"}):
+                    st.pyplot(fig)
                 plt.close()
             else:
                 st.caption("No valid price-per-sqft data after filtering.")
@@ -443,24 +544,8 @@ elif nav == "Dashboard":
             if not amenity_cols:
                 st.caption("No amenity columns in data.")
             else:
-                rows = []
-                for col in amenity_cols:
-                    name = col.replace("has_", "").replace("_", " ").title()
-                    with_amenity = df_dash[df_dash[col] == 1]["price_kes"].median()
-                    without_amenity = df_dash[df_dash[col] == 0]["price_kes"].median()
-                    count_with = (df_dash[col] == 1).sum()
-                    rows.append({
-                        "amenity": name,
-                        "median_price_with": with_amenity,
-                        "median_price_without": without_amenity,
-                        "premium_kes": with_amenity - without_amenity,
-                        "listings_with": int(count_with),
-                    })
-                impact_df = pd.DataFrame(rows).sort_values("premium_kes", ascending=False)
-                impact_df["premium_pct"] = (
-                    (impact_df["median_price_with"] - impact_df["median_price_without"])
-                    / impact_df["median_price_without"].replace(0, np.nan) * 100
-                )
+                with telemetry.timer("app_aggregate_seconds", {"view": "amenity_impact"}):
+                    impact_df = dashboard.amenity_impact(df_dash)
                 st.dataframe(
                     impact_df.style.format({
                         "median_price_with": "{:,.0f}",
@@ -481,7 +566,8 @@ elif nav == "Dashboard":
                 ax.set_title("Amenity impact on price")
                 ax.axvline(0, color="gray", linewidth=0.8)
                 plt.tight_layout()
-                st.pyplot(fig)
+                with telemetry.timer("app_render_seconds", {"figure": "amenity_impact"}):
+                    st.pyplot(fig)
                 plt.close()
 
     st.divider()
@@ -0,0 +1,3 @@
+"""Nairobi House Price Prediction - Benchmarks"""
+from .synthetic import generate_clean_listings, generate_listing_pages, generate_raw_for_clean, generate_raw_listings
+__all__ = ['generate_clean_listings', 'generate_listing_pages', 'generate_raw_for_clean', 'generate_raw_listings']
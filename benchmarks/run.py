@@ -0,0 +1,254 @@
+"""End-to-end benchmark runner with a JSON history and a regression gate.
+
+Usage (from the project root):
+
+    python -m benchmarks.run --rows 1000 100000
+    python -m benchmarks.run --rows 100000 --compare benchmarks/results/baseline.json
+
+Each case reports throughput (items/s, from the median of at least ``--repeat``
+runs and at least ``MIN_CASE_SECONDS`` of timing) and peak traced memory (a separate run under tracemalloc, so tracing does not skew the
+timings). Results are written to ``benchmarks/results/<timestamp>.json``; with
+``--compare`` the run exits non-zero when any case is slower or uses more
+memory than the baseline beyond ``--tolerance`` (and beyond an absolute noise
+floor, so sub-millisecond cases do not flag on scheduler jitter).
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import BASE_DIR, generate_listing_pages, generate_raw_for_clean
+from pricing import dashboard
+from pricing.intervals import fit_conformal, predict_with_interval
+from pricing.cleaning import add_features, clean_listings
+from pricing.training import TARGET, encode, extend_encoder, prepare_model_frame, train_full
+from scrapers import BRKScraper
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+MODEL_PATH = os.path.join(BASE_DIR, 'data', 'model.pkl')
+
+# HTML generation and parsing are per-card Python; cap them so large table scales stay practical
+MAX_HTML_CARDS = 20_000
+MAX_BATCH_ROWS = 1_000_000
+SINGLE_PREDICT_CALLS = 200
+
+# Fast cases are repeated until this much time is measured, so the median is stable
+MIN_CASE_SECONDS = 0.2
+# Differences below these are treated as noise by the regression gate
+TIME_NOISE_FLOOR_SECONDS = 0.002
+MEMORY_NOISE_FLOOR_MB = 1.0
+
+# A case is (name, items processed, unit, function to time)
+Case = Tuple[str, int, str, Callable[[], object]]
+
+
+def _load_artifact(df_clean: pd.DataFrame) -> Dict:
+    """Saved model artifact, or a model trained on a synthetic sample if there is none"""
+    if os.path.exists(MODEL_PATH):
+        with open(MODEL_PATH, 'rb') as f:
+            return pickle.load(f)
+    logger.info("No data/model.pkl, training a model on synthetic listings")
+    artifact, _ = train_full(df_clean.head(20_000))
+    return artifact
+
+
+def _feature_frame(artifact: Dict, df_clean: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """Unscaled features and target, extending encoders for synthetic-only labels"""
+    df_model = prepare_model_frame(df_clean)
+    extend_encoder(artifact['le_location'], df_model['location'])
+    extend_encoder(artifact['le_type'], df_model['property_type'])
+    return encode(df_model, artifact['le_location'], artifact['le_type']), df_model[TARGET]
+
+
+def build_cases(n_rows: int, seed: int = 42) -> Tuple[List[Case], int]:
+    """Benchmark cases at one data scale (``n_rows`` clean listings) and the clean row count"""
+    # Raw is oversampled so the clean table really has n_rows rows after dedup/outlier removal
+    raw, cleaned = generate_raw_for_clean(n_rows, seed=seed)
+    df_clean = add_features(cleaned.copy())
+    n_cards = min(n_rows, MAX_HTML_CARDS)
+    pages = generate_listing_pages(n_cards, raw=raw)
+    scraper = BRKScraper(delay=0)
+
+    artifact = _load_artifact(df_clean)
+    model = artifact['model']
+    X_frame, y = _feature_frame(artifact, df_clean.head(MAX_BATCH_ROWS))
+    X = X_frame
+    if artifact.get('use_scaler') and artifact.get('scaler') is not None:
+        X = artifact['scaler'].transform(X_frame)
+    X_single = X[:1] if isinstance(X, np.ndarray) else X.iloc[:1]
+    if 'intervals' not in artifact:
+        # Older artifacts have no calibration; calibrate on the synthetic rows so the case can run
+        artifact['intervals'] = fit_conformal(
+            y, model.predict(X), X_frame['location_enc'], len(artifact['le_location'].classes_)
+        )
+
+    def parse_pages():
+        return [scraper.parse_page(html) for html in pages]
+
+    def aggregates():
+        dashboard.location_medians(df_clean)
+        dashboard.monthly_trend(df_clean)
+        dashboard.price_per_sqft_medians(dashboard.price_per_sqft_frame(df_clean), 'location')
+        dashboard.amenity_impact(df_clean)
+
+    def load_artifact():
+        if os.path.exists(MODEL_PATH):
+            with open(MODEL_PATH, 'rb') as f:
+                pickle.load(f)
+        else:
+            pickle.loads(pickle.dumps(artifact))
+
+    def predict_single():
+        for _ in range(SINGLE_PREDICT_CALLS):
+            model.predict(X_single)
+
+    return [
+        ('scraper_parse', n_cards, 'cards', parse_pages),
+        ('clean', len(raw), 'rows', lambda: clean_listings(raw.copy())),
+        ('features', len(cleaned), 'rows', lambda: add_features(cleaned.copy())),
+        ('dashboard_aggregates', len(df_clean), 'rows', aggregates),
+        ('artifact_load', 1, 'loads', load_artifact),
+        ('predict_single', SINGLE_PREDICT_CALLS, 'predictions', predict_single),
+        ('predict_batch', len(X), 'predictions', lambda: model.predict(X)),
+        ('predict_interval_batch', len(X_frame), 'predictions', lambda: predict_with_interval(artifact, X_frame)),
+    ], len(df_clean)
+
+
+def measure(func: Callable[[], object], repeat: int, min_seconds: float = MIN_CASE_SECONDS) -> Tuple[float, float, float]:
+    """Median and best wall time, and peak traced memory (MB) of one more run.
+
+    Runs at least ``repeat`` times and until ``min_seconds`` have been timed.
+    """
+    times: List[float] = []
+    while len(times) < repeat or sum(times) < min_seconds:
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return float(np.median(times)), min(times), peak / 1e6
+
+
+def run(scales: List[int], repeat: int = 3, seed: int = 42, only: Optional[List[str]] = None) -> Dict:
+    """Run all cases at every scale and return the results document"""
+    results = []
+    for n_rows in scales:
+        cases, n_clean = build_cases(n_rows, seed=seed)
+        for name, n_items, unit, func in cases:
+            if only and name not in only:
+                continue
+            seconds, best_seconds, peak_mb = measure(func, repeat)
+            results.append({
+                'name': name,
+                'rows': n_rows,
+                'clean_rows': n_clean,
+                'items': n_items,
+                'unit': unit,
+                'seconds': seconds,
+                'best_seconds': best_seconds,
+                'throughput': n_items / seconds if seconds > 0 else float('inf'),
+                'peak_mem_mb': peak_mb,
+            })
+            print(f"{name:<22} rows={n_rows:<10,} {results[-1]['throughput']:>14,.1f} {unit}/s  peak {peak_mb:,.1f} MB")
+    return {'meta': _metadata(repeat, seed), 'results': results}
+
+
+def _metadata(repeat: int, seed: int) -> Dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'repeat': repeat,
+        'seed': seed,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of ``current`` against ``baseline`` (matching cases by name and rows)"""
+    base = {(r['name'], r['rows']): r for r in baseline['results']}
+    regressions = []
+    for r in current['results']:
+        b = base.get((r['name'], r['rows']))
+        if b is None:
+            continue
+        # Slower only if even the fastest current run is behind the baseline median
+        best = r.get('best_seconds', r['seconds'])
+        if best > b['seconds'] * (1 + tolerance) and best - b['seconds'] > TIME_NOISE_FLOOR_SECONDS:
+            regressions.append(
+                f"{r['name']} @ {r['rows']:,} rows: throughput {r['throughput']:,.1f} < baseline {b['throughput']:,.1f} {r['unit']}/s"
+            )
+        if r['peak_mem_mb'] > b['peak_mem_mb'] * (1 + tolerance) and r['peak_mem_mb'] - b['peak_mem_mb'] > MEMORY_NOISE_FLOOR_MB:
+            regressions.append(
+                f"{r['name']} @ {r['rows']:,} rows: peak memory {r['peak_mem_mb']:,.1f} MB > baseline {b['peak_mem_mb']:,.1f} MB"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run end-to-end benchmarks on synthetic Nairobi listings")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000], help="Clean table sizes to benchmark (1K-10M rows)")
+    parser.add_argument('--repeat', type=int, default=3, help="Minimum timed runs per case (median is kept)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', nargs='+', help="Run only these cases")
+    parser.add_argument('--output', help="Results JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--compare', help="Baseline results JSON to gate against")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Allowed relative slowdown / memory growth")
+    args = parser.parse_args(argv)
+    # Per-call INFO logs from the pipeline would drown out the results table
+    logging.getLogger('pricing').setLevel(logging.WARNING)
+
+    current = run(args.rows, repeat=args.repeat, seed=args.seed, only=args.only)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ') + '.json'
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"No regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Synthetic Nairobi listings: raw/clean tables and BuyRentKenya-style card HTML.
+
+Columns follow ``data/data_dictionary.md``. Location and property type
+frequencies are taken from ``data/raw_listings.csv`` when it exists, so
+synthetic data has the same long tail of "Sub-area, Westlands" style names
+the scraper produces.
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pricing.cleaning import add_features, clean_listings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_PATH = os.path.join(BASE_DIR, 'data', 'raw_listings.csv')
+
+# Fallback vocabularies (data dictionary examples) when no raw data is available
+DEFAULT_LOCATIONS = [
+    'Westlands', 'Karen', 'Kilimani', 'Nairobi', 'Nairobi Central', 'Kasarani', 'Kileleshwa',
+    'Kahawa', 'Utawala', 'Lavington', 'Runda', 'Muthaiga', 'Syokimau', 'Ngong', 'South B',
+]
+DEFAULT_PROPERTY_TYPES = ['Apartment', 'House', 'Townhouse', 'Villa', 'Bungalow', 'Maisonette', 'Plot', 'Other']
+
+# Amenity labels as produced by BRKScraper._extract_amenities, with the
+# keyword used in generated descriptions and the share of listings that have it
+AMENITIES: List[Tuple[str, str, float]] = [
+    ('Aircon', 'air conditioning', 0.12),
+    ('Borehole', 'borehole', 0.05),
+    ('Garden', 'garden', 0.10),
+    ('Generator', 'backup generator', 0.04),
+    ('Gym', 'gym', 0.05),
+    ('Internet', 'fibre internet', 0.04),
+    ('Parking', 'parking', 0.15),
+    ('Pool', 'swimming pool', 0.05),
+    ('Security', 'cctv', 0.08),
+    ('Staff quarters', 'staff quarters', 0.18),
+]
+
+# Median monthly rent (KES) by bedrooms, roughly matching the scraped data
+RENT_BY_BEDROOMS = {0: 60_000, 1: 45_000, 2: 90_000, 3: 180_000, 4: 300_000, 5: 420_000, 6: 550_000}
+
+
+def load_vocabularies(raw_path: str = RAW_PATH) -> Tuple[pd.Series, pd.Series]:
+    """Location and property type frequencies (normalized value counts)"""
+    if os.path.exists(raw_path):
+        raw = pd.read_csv(raw_path, usecols=['location', 'property_type'])
+        return raw['location'].value_counts(normalize=True), raw['property_type'].value_counts(normalize=True)
+    locations = pd.Series(1.0 / len(DEFAULT_LOCATIONS), index=DEFAULT_LOCATIONS)
+    types = pd.Series(1.0 / len(DEFAULT_PROPERTY_TYPES), index=DEFAULT_PROPERTY_TYPES)
+    return locations, types
+
+
+def _amenity_strings() -> np.ndarray:
+    """Comma-joined amenity label for every bitmask over AMENITIES"""
+    labels = [a[0] for a in AMENITIES]
+    return np.array([
+        ', '.join(labels[i] for i in range(len(labels)) if mask >> i & 1)
+        for mask in range(1 << len(labels))
+    ], dtype=object)
+
+
+def _amenity_masks(rng: np.random.Generator, n_rows: int) -> np.ndarray:
+    masks = np.zeros(n_rows, dtype=np.int64)
+    for i, (_, _, share) in enumerate(AMENITIES):
+        masks |= (rng.random(n_rows) < share).astype(np.int64) << i
+    return masks
+
+
+def generate_raw_listings(n_rows: int, seed: int = 42, raw_path: str = RAW_PATH) -> pd.DataFrame:
+    """Raw listings table with the schema of data/raw_listings.csv"""
+    rng = np.random.default_rng(seed)
+    loc_freq, type_freq = load_vocabularies(raw_path)
+
+    location = rng.choice(loc_freq.index.to_numpy(dtype=object), size=n_rows, p=loc_freq.to_numpy())
+    property_type = rng.choice(type_freq.index.to_numpy(dtype=object), size=n_rows, p=type_freq.to_numpy())
+    is_land = np.isin(property_type, ['Land', 'Plot'])
+
+    bedrooms = rng.choice([1, 2, 3, 4, 5, 6], size=n_rows, p=[0.03, 0.06, 0.10, 0.37, 0.40, 0.04])
+    bedrooms = np.where(is_land, 0, bedrooms)
+    bathrooms = np.where(is_land, 0, np.maximum(1, bedrooms - rng.integers(0, 2, size=n_rows)))
+
+    # Most BRK cards have no size; the rest are ~70-150 sqm per bedroom
+    size_sqm = np.maximum(1, bedrooms) * rng.lognormal(np.log(90), 0.35, size=n_rows)
+    size_sqft = np.where(rng.random(n_rows) < 0.6, 0.0, np.round(size_sqm * 10.7639, 2))
+
+    # Location premium: one seeded price factor per location
+    loc_codes, loc_index = np.unique(location, return_inverse=True)
+    loc_factor = np.random.default_rng(seed + 1).lognormal(0, 0.35, size=len(loc_codes))[loc_index]
+    base_rent = np.array([RENT_BY_BEDROOMS[b] for b in range(7)])[np.minimum(bedrooms, 6)]
+    # Whole shillings rather than round hundreds, so few rows collide on the cleaning dedup key
+    price = base_rent * loc_factor * rng.lognormal(0, 0.3, size=n_rows)
+    price = np.round(price)
+    # A handful of sale listings / typos far outside the rent range, as in the real scrape
+    outliers = rng.random(n_rows) < 0.005
+    price = np.where(outliers, price * rng.choice([100, 500], size=n_rows), price)
+
+    amenities = _amenity_strings()[_amenity_masks(rng, n_rows)]
+    dates = pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 180, size=n_rows), unit='D')
+
+    return pd.DataFrame({
+        'location': location,
+        'property_type': property_type,
+        'bedrooms': bedrooms,
+        'bathrooms': bathrooms,
+        'size_sqft': size_sqft,
+        'amenities': amenities,
+        'price_kes': price.astype(float),
+        'listing_date': dates.strftime('%Y-%m-%d'),
+        'source': 'BuyRentKenya',
+    })
+
+
+def generate_raw_for_clean(n_rows: int, seed: int = 42, raw_path: str = RAW_PATH) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Raw listings oversampled so cleaning keeps ``n_rows``; returns (raw, first n_rows cleaned)"""
+    n_raw = n_rows
+    while True:
+        raw = generate_raw_listings(n_raw, seed=seed, raw_path=raw_path)
+        cleaned = clean_listings(raw.copy())
+        if len(cleaned) >= n_rows:
+            return raw, cleaned.head(n_rows)
+        # Duplicates and outliers dropped by cleaning; grow by the observed loss plus a margin
+        n_raw = int(np.ceil(n_raw * n_rows / max(len(cleaned), 1) * 1.01)) + 1
+
+
+def generate_clean_listings(n_rows: int, seed: int = 42, raw_path: str = RAW_PATH) -> pd.DataFrame:
+    """Clean listings table of ``n_rows`` rows, from the cleaning pipeline on synthetic raw data"""
+    _, cleaned = generate_raw_for_clean(n_rows, seed=seed, raw_path=raw_path)
+    return add_features(cleaned)
+
+
+def _card_html(row, description: str) -> str:
+    size = f'<span>{row.size_sqft / 10.7639:,.0f} m²</span>' if row.size_sqft > 0 else ''
+    kind = row.property_type.lower()
+    return (
+        '<div class="listing-card relative flex">'
+        f'<a href="/listings/{kind}-{row.Index}"><h2>{row.bedrooms} Bed {row.property_type} for rent</h2></a>'
+        f'<p class="location">{row.location}</p>'
+        f'<span>{row.bedrooms} Bedrooms</span><span>{row.bathrooms} Bathrooms</span>{size}'
+        f'<div class="price">KSh {row.price_kes:,.0f} / month</div>'
+        f'<p class="description">{description}</p>'
+        '</div>'
+    )
+
+
+def generate_listing_pages(
+    n_cards: int,
+    cards_per_page: int = 20,
+    seed: int = 42,
+    raw: Optional[pd.DataFrame] = None,
+) -> List[str]:
+    """Search-results pages of listing-card HTML that BRKScraper.parse_page understands"""
+    if raw is None:
+        raw = generate_raw_listings(n_cards, seed=seed)
+    raw = raw.head(n_cards)
+    keywords = {a[0]: a[1] for a in AMENITIES}
+    pages = []
+    for start in range(0, len(raw), cards_per_page):
+        cards = []
+        for row in raw.iloc[start:start + cards_per_page].itertuples():
+            terms = [keywords[a] for a in row.amenities.split(', ') if a in keywords]
+            description = 'Well finished home in a quiet neighbourhood'
+            if terms:
+                description += ' with ' + ', '.join(terms)
+            cards.append(_card_html(row, description + '.'))
+        pages.append(
+            '<html><head><title>Houses for rent in Nairobi</title></head><body>'
+            '<nav><a href="/">BuyRentKenya</a></nav><main>'
+            + ''.join(cards)
+            + '</main><footer>© BuyRentKenya</footer></body></html>'
+        )
+    return pages
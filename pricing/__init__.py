@@ -0,0 +1,6 @@
+"""Nairobi House Price Prediction - Pricing engine"""
+from . import cleaning, dashboard
+from .comparables import ComparablesIndex
+from .intervals import fit_conformal, predict_with_interval
+from .training import build_artifact, calibrate_intervals, fit_intervals, refresh, train_full, train_incremental, train_models
+__all__ = ['cleaning', 'dashboard', 'ComparablesIndex', 'fit_conformal', 'predict_with_interval', 'build_artifact', 'calibrate_intervals', 'fit_intervals', 'refresh', 'train_full', 'train_incremental', 'train_models']
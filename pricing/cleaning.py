@@ -0,0 +1,86 @@
+"""Cleaning and feature engineering for raw listings (notebook 01 as functions)"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+import telemetry
+
+logger = logging.getLogger(__name__)
+
+LOCATION_MAPPING = {
+    'Nairobi Central': 'Nairobi CBD',
+    'Nairobi': 'Nairobi Other',
+    'Riverside Drive': 'Westlands',
+    'Kahawa Sukari': 'Kasarani',
+    'Kahawa': 'Kasarani',
+    'Mlolongo': 'Syokimau',
+    'Athi River': 'Athi River',
+}
+
+AMENITY_LIST = ['parking', 'pool', 'gym', 'security', 'garden', 'generator', 'borehole', 'staff quarters', 'aircon', 'internet']
+
+CLEAN_COLUMNS = [
+    'location', 'property_type', 'bedrooms', 'bathrooms',
+    'size_sqft', 'amenities', 'amenity_score',
+    'has_parking', 'has_pool', 'has_gym', 'has_security', 'has_garden',
+    'has_generator', 'has_borehole', 'has_staff_quarters', 'has_aircon', 'has_internet',
+    'price_kes', 'price_per_sqft',
+    'listing_date', 'month', 'month_name',
+    'is_land', 'source'
+]
+
+
+@telemetry.timed('pipeline_stage_seconds', {'stage': 'clean'})
+def clean_listings(df: pd.DataFrame) -> pd.DataFrame:
+    """Deduplicate, impute, standardize and drop outliers from raw listings"""
+    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=['price_kes', 'location', 'bedrooms', 'property_type']).copy()
+
+    # 0.0 size means missing; impute by property type, then overall median
+    df['size_sqft'] = df['size_sqft'].replace(0.0, np.nan)
+    df['size_sqft'] = df['size_sqft'].fillna(df.groupby('property_type')['size_sqft'].transform('median'))
+    df['size_sqft'] = df['size_sqft'].fillna(df['size_sqft'].median())
+    df['amenities'] = df['amenities'].fillna('').replace('', 'None')
+
+    df['location'] = df['location'].replace(LOCATION_MAPPING)
+
+    # Reclassify "Other" by bedroom count
+    other = df['property_type'] == 'Other'
+    df.loc[other, 'property_type'] = np.select(
+        [df.loc[other, 'bedrooms'] == 0, df.loc[other, 'bedrooms'] <= 2, df.loc[other, 'bedrooms'] <= 4],
+        ['Plot', 'Apartment', 'House'],
+        default='Mansion',
+    )
+
+    # Price outliers (wide IQR on 5th/95th percentiles) and unrealistic sizes
+    q1 = df['price_kes'].quantile(0.05)
+    q3 = df['price_kes'].quantile(0.95)
+    iqr = q3 - q1
+    df_clean = df[(df['price_kes'] >= q1 - 1.5 * iqr) & (df['price_kes'] <= q3 + 1.5 * iqr)]
+    df_clean = df_clean[df_clean['size_sqft'] < 100000].copy()
+    logger.info(f"Cleaned {len(df)} deduplicated listings down to {len(df_clean)}")
+    return df_clean
+
+
+@telemetry.timed('pipeline_stage_seconds', {'stage': 'features'})
+def add_features(df_clean: pd.DataFrame) -> pd.DataFrame:
+    """Add price_per_sqft, amenity score/flags, month and is_land; return CLEAN_COLUMNS"""
+    df_clean['price_per_sqft'] = (df_clean['price_kes'] / df_clean['size_sqft']).round(2)
+
+    amenities = df_clean['amenities'].fillna('').astype(str)
+    parts = amenities.str.split(',').explode().str.strip()
+    df_clean['amenity_score'] = parts.ne('').groupby(level=0).sum().astype(int)
+    df_clean.loc[amenities.isin(['None', '']), 'amenity_score'] = 0
+
+    df_clean['listing_date'] = pd.to_datetime(df_clean['listing_date'])
+    df_clean['month'] = df_clean['listing_date'].dt.month
+    df_clean['month_name'] = df_clean['listing_date'].dt.strftime('%B')
+
+    amenities_lower = amenities.str.lower()
+    for amenity in AMENITY_LIST:
+        df_clean[f'has_{amenity.replace(" ", "_")}'] = amenities_lower.str.contains(amenity, regex=False).astype(int)
+
+    df_clean['is_land'] = df_clean['property_type'].isin(['Land', 'Plot']).astype(int)
+    return df_clean[CLEAN_COLUMNS].reset_index(drop=True)
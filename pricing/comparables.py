@@ -0,0 +1,178 @@
+"""Comparable-properties search over clean listings (k-NN on standardized features)"""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+import telemetry
+
+logger = logging.getLogger(__name__)
+
+# Features used to measure similarity, with their relative weights.
+# 'location_price' is the log median price of the listing's location, so
+# areas with similar price levels (e.g. Karen vs Runda) count as close.
+FEATURE_WEIGHTS: Dict[str, float] = {
+    'log_size_sqft': 2.0,
+    'bedrooms': 1.5,
+    'bathrooms': 0.75,
+    'location_price': 2.0,
+    'amenity_score': 0.5,
+    'has_parking': 0.25,
+    'has_pool': 0.25,
+    'has_gym': 0.25,
+    'has_security': 0.25,
+    'has_garden': 0.25,
+    'is_land': 3.0,
+}
+
+DISPLAY_COLS = ['location', 'property_type', 'bedrooms', 'bathrooms', 'size_sqft', 'amenities', 'price_kes']
+
+
+class ComparablesIndex:
+    """Nearest-neighbour index over listings for finding comparable properties.
+
+    The bulk of the listings live in a KD-tree built at fit time. Rows added
+    later go into a small delta buffer that is searched by brute force and
+    merged into the tree once it grows past ``rebuild_ratio`` of the tree size,
+    so a new crawl does not force a full rebuild on every refresh.
+
+    The index is shared across app sessions, so ``fit``/``add``/``sync`` and
+    ``query`` are serialized by a lock.
+    """
+
+    def __init__(self, leaf_size: int = 40, rebuild_ratio: float = 0.1):
+        self.leaf_size = leaf_size
+        self.rebuild_ratio = rebuild_ratio
+        self.listings: Optional[pd.DataFrame] = None
+        self.n_rows = 0
+        self.version = None
+        self._lock = threading.RLock()
+        self._row_hashes = np.empty(0, dtype=np.uint64)
+        self._tree: Optional[KDTree] = None
+        self._n_tree = 0
+        self._delta = np.empty((0, len(FEATURE_WEIGHTS)))
+        self._location_price: Dict[str, float] = {}
+        self._default_location_price = 0.0
+        self._mean = np.zeros(len(FEATURE_WEIGHTS))
+        self._scale = np.ones(len(FEATURE_WEIGHTS))
+        self._weights = np.array(list(FEATURE_WEIGHTS.values()))
+
+    def _raw_features(self, df: pd.DataFrame) -> np.ndarray:
+        """Build the unscaled feature matrix for listings"""
+        features = pd.DataFrame(index=df.index)
+        features['log_size_sqft'] = np.log1p(df['size_sqft'].astype(float).clip(lower=0))
+        loc_price = df['location'].map(self._location_price)
+        features['location_price'] = loc_price.fillna(self._default_location_price)
+        for col in FEATURE_WEIGHTS:
+            if col not in features:
+                features[col] = df[col].astype(float) if col in df else 0.0
+        return features[list(FEATURE_WEIGHTS)].to_numpy(dtype=float)
+
+    def _transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Standardize and weight features so euclidean distance reflects similarity"""
+        return (self._raw_features(df) - self._mean) / self._scale * self._weights
+
+    def fit(self, df: pd.DataFrame) -> 'ComparablesIndex':
+        """Build the index from scratch over all listings"""
+        with self._lock:
+            return self._fit(df)
+
+    @telemetry.timed('comparables_build_seconds')
+    def _fit(self, df: pd.DataFrame) -> 'ComparablesIndex':
+        df = df.reset_index(drop=True)
+        log_price = np.log1p(df['price_kes'].astype(float))
+        self._location_price = log_price.groupby(df['location']).median().to_dict()
+        self._default_location_price = float(log_price.median()) if len(df) else 0.0
+
+        raw = self._raw_features(df)
+        self._mean = raw.mean(axis=0) if len(df) else np.zeros(raw.shape[1])
+        scale = raw.std(axis=0) if len(df) else np.ones(raw.shape[1])
+        self._scale = np.where(scale > 0, scale, 1.0)
+
+        self.listings = df
+        self.n_rows = len(df)
+        self._row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        self._tree = KDTree(self._transform(df), leaf_size=self.leaf_size) if len(df) else None
+        self._n_tree = len(df)
+        self._delta = np.empty((0, raw.shape[1]))
+        logger.info(f"Built comparables index over {self.n_rows} listings")
+        return self
+
+    def add(self, df_new: pd.DataFrame) -> None:
+        """Append new listings, rebuilding the tree only when the delta gets large"""
+        with self._lock:
+            self._add(df_new)
+
+    def _add(self, df_new: pd.DataFrame) -> None:
+        if self.listings is None:
+            self._fit(df_new)
+            return
+        if len(df_new) == 0:
+            return
+        df_new = df_new.reset_index(drop=True)
+        listings = pd.concat([self.listings, df_new], ignore_index=True)
+        if len(self._delta) + len(df_new) > self.rebuild_ratio * max(self._n_tree, 1):
+            self._fit(listings)
+            return
+        self._delta = np.vstack([self._delta, self._transform(df_new)])
+        self._row_hashes = np.concatenate([
+            self._row_hashes, pd.util.hash_pandas_object(df_new, index=False).to_numpy()
+        ])
+        self.listings = listings
+        self.n_rows = len(listings)
+
+    def sync(self, df: pd.DataFrame, version=None) -> None:
+        """Bring the index up to date with ``df`` (e.g. keyed on the CSV's mtime).
+
+        Nothing happens while ``version`` is unchanged. Otherwise rows already
+        indexed are compared by content hash: if they are untouched only the
+        appended rows are added, else the index is rebuilt.
+        """
+        with self._lock:
+            if self.listings is not None and version is not None and version == self.version:
+                return
+            if self.listings is None or len(df) < self.n_rows:
+                self._fit(df)
+            else:
+                prefix = pd.util.hash_pandas_object(df.iloc[:self.n_rows], index=False).to_numpy()
+                if not np.array_equal(prefix, self._row_hashes):
+                    self._fit(df)
+                elif len(df) > self.n_rows:
+                    self._add(df.iloc[self.n_rows:])
+            self.version = version
+
+    def query(self, listing: Dict, k: int = 5) -> pd.DataFrame:
+        """Return the k listings most similar to ``listing``, closest first"""
+        with self._lock:
+            return self._query(listing, k)
+
+    def _query(self, listing: Dict, k: int) -> pd.DataFrame:
+        if self.listings is None or self.n_rows == 0:
+            return pd.DataFrame(columns=DISPLAY_COLS + ['similarity'])
+        x = self._transform(pd.DataFrame([listing]))
+        k = min(k, self.n_rows)
+
+        dists: List[np.ndarray] = []
+        idx: List[np.ndarray] = []
+        if self._tree is not None:
+            d, i = self._tree.query(x, k=min(k, self._n_tree))
+            dists.append(d[0])
+            idx.append(i[0])
+        if len(self._delta):
+            d = np.sqrt(((self._delta - x) ** 2).sum(axis=1))
+            top = np.argsort(d)[:k]
+            dists.append(d[top])
+            idx.append(top + self._n_tree)
+
+        dists_all = np.concatenate(dists)
+        idx_all = np.concatenate(idx)
+        order = np.argsort(dists_all)[:k]
+
+        cols = [c for c in DISPLAY_COLS if c in self.listings.columns]
+        result = self.listings.iloc[idx_all[order]][cols].copy()
+        result['similarity'] = 1.0 / (1.0 + dists_all[order])
+        return result.reset_index(drop=True)
@@ -0,0 +1,56 @@
+"""Dashboard aggregates over clean listings (shared by the app and benchmarks)"""
+
+import numpy as np
+import pandas as pd
+
+
+def location_medians(df: pd.DataFrame) -> pd.Series:
+    """Median price per location, ascending"""
+    return df.groupby("location")["price_kes"].median().sort_values(ascending=True)
+
+
+def monthly_trend(df: pd.DataFrame) -> pd.DataFrame:
+    """Median price and listing count per month"""
+    monthly = df.groupby("month").agg(
+        median_price=("price_kes", "median"),
+        count=("price_kes", "count"),
+    ).reset_index()
+    return monthly.sort_values("month")
+
+
+def price_per_sqft_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Non-land listings with a valid price per sqft, capped at the 99th percentile"""
+    df_sqft = df[df["is_land"] != 1]
+    df_sqft = df_sqft[df_sqft["price_per_sqft"].notna() & (df_sqft["price_per_sqft"] > 0)]
+    cap = df_sqft["price_per_sqft"].quantile(0.99)
+    return df_sqft[df_sqft["price_per_sqft"] <= cap].copy()
+
+
+def price_per_sqft_medians(df_sqft: pd.DataFrame, by: str) -> pd.Series:
+    """Median price per sqft grouped by ``by``, ascending"""
+    return df_sqft.groupby(by)["price_per_sqft"].median().sort_values(ascending=True)
+
+
+def amenity_impact(df: pd.DataFrame) -> pd.DataFrame:
+    """Median price with vs without each has_* amenity, sorted by premium"""
+    amenity_cols = [c for c in df.columns if c.startswith("has_")]
+    rows = []
+    for col in amenity_cols:
+        name = col.replace("has_", "").replace("_", " ").title()
+        with_amenity = df[df[col] == 1]["price_kes"].median()
+        without_amenity = df[df[col] == 0]["price_kes"].median()
+        count_with = (df[col] == 1).sum()
+        rows.append({
+            "amenity": name,
+            "median_price_with": with_amenity,
+            "median_price_without": without_amenity,
+            "premium_kes": with_amenity - without_amenity,
+            "listings_with": int(count_with),
+        })
+    impact_df = pd.DataFrame(rows, columns=["amenity", "median_price_with", "median_price_without", "premium_kes", "listings_with"])
+    impact_df = impact_df.sort_values("premium_kes", ascending=False)
+    impact_df["premium_pct"] = (
+        (impact_df["median_price_with"] - impact_df["median_price_without"])
+        / impact_df["median_price_without"].replace(0, np.nan) * 100
+    )
+    return impact_df
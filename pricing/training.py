@@ -0,0 +1,381 @@
+"""Model training: full retrain and incremental refresh from new crawl deltas"""
+
+import logging
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+import telemetry
+from .intervals import fit_conformal
+
+try:
+    import xgboost as xgb
+    HAS_XGBOOST = True
+except ImportError:
+    HAS_XGBOOST = False
+
+logger = logging.getLogger(__name__)
+
+FEATURES = [
+    'bedrooms', 'bathrooms', 'size_sqft',
+    'amenity_score', 'has_parking', 'has_pool',
+    'has_gym', 'has_security', 'has_garden',
+    'is_land', 'location', 'property_type'
+]
+TARGET = 'price_kes'
+FEATURE_COLS = [
+    'bedrooms', 'bathrooms', 'size_sqft',
+    'amenity_score', 'has_parking', 'has_pool',
+    'has_gym', 'has_security', 'has_garden',
+    'is_land', 'location_enc', 'property_type_enc'
+]
+
+# Drift thresholds beyond which an incremental refresh is not trusted. PSI on a
+# small delta is mostly sampling noise (about (bins - 1) / n), so a shift only
+# counts when a two-sample KS test also rejects "same distribution".
+PSI_THRESHOLD = 0.2
+DRIFT_P_VALUE = 0.01
+UNSEEN_LOCATION_THRESHOLD = 0.2
+# Below this many rows the unseen-location share is too noisy to act on
+MIN_DRIFT_ROWS = 30
+# Once the delta is as large as the history, a full retrain costs about the same
+MAX_DELTA_RATIO = 1.0
+# Deltas at least this large hold out a slice to recalibrate interval widths
+MIN_RECALIBRATION_ROWS = 50
+
+
+def prepare_model_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Select modelling columns and drop incomplete rows (as in notebook 03)"""
+    return df[FEATURES + [TARGET]].dropna().copy()
+
+
+def extend_encoder(encoder: LabelEncoder, values: pd.Series) -> List[str]:
+    """Append unseen labels to a fitted LabelEncoder and return them.
+
+    New labels go at the end of ``classes_`` so codes already learned by the
+    model keep their meaning. Labels are strings, which LabelEncoder maps via a
+    lookup table, so ``classes_`` does not have to stay sorted.
+    """
+    known = set(encoder.classes_.tolist())
+    unseen = sorted(set(values.astype(str)) - known)
+    if unseen:
+        encoder.classes_ = np.concatenate([encoder.classes_.astype(object), np.array(unseen, dtype=object)])
+    return unseen
+
+
+def encode(df_model: pd.DataFrame, le_location: LabelEncoder, le_type: LabelEncoder) -> pd.DataFrame:
+    """Add encoded location/property type columns and return the feature matrix"""
+    df_model = df_model.copy()
+    df_model['location_enc'] = le_location.transform(df_model['location'].astype(str))
+    df_model['property_type_enc'] = le_type.transform(df_model['property_type'].astype(str))
+    return df_model[FEATURE_COLS]
+
+
+def _psi(expected: np.ndarray, actual: np.ndarray, bins: int = 10) -> float:
+    """Population stability index of ``actual`` against decile bins of ``expected``"""
+    if len(expected) == 0 or len(actual) == 0:
+        return 0.0
+    edges = np.unique(np.quantile(expected, np.linspace(0, 1, bins + 1)))
+    if len(edges) < 3:
+        return 0.0
+    edges[0], edges[-1] = -np.inf, np.inf
+    exp_pct = np.histogram(expected, edges)[0] / len(expected)
+    act_pct = np.histogram(actual, edges)[0] / len(actual)
+    exp_pct = np.clip(exp_pct, 1e-4, None)
+    act_pct = np.clip(act_pct, 1e-4, None)
+    return float(np.sum((act_pct - exp_pct) * np.log(act_pct / exp_pct)))
+
+
+def _ks_p_value(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Two-sample Kolmogorov-Smirnov p-value (1.0 when either side is empty)"""
+    if len(expected) == 0 or len(actual) == 0:
+        return 1.0
+    return float(ks_2samp(expected, actual).pvalue)
+
+
+def check_drift(history: pd.DataFrame, delta: pd.DataFrame, le_location: LabelEncoder) -> Dict:
+    """Compare the delta with the training history and decide whether a full retrain is needed"""
+    report = {
+        'delta_ratio': len(delta) / max(len(history), 1),
+        'unseen_location_share': float((~delta['location'].astype(str).isin(le_location.classes_)).mean()) if len(delta) else 0.0,
+    }
+    reasons = []
+    if report['delta_ratio'] > MAX_DELTA_RATIO:
+        reasons.append(f"delta is {report['delta_ratio']:.0%} of history")
+    for name, column in (('price', TARGET), ('size', 'size_sqft')):
+        expected = np.log1p(history[column].to_numpy())
+        actual = np.log1p(delta[column].to_numpy())
+        report[f'psi_{name}'] = _psi(expected, actual)
+        report[f'ks_p_{name}'] = _ks_p_value(expected, actual)
+        if report[f'psi_{name}'] > PSI_THRESHOLD and report[f'ks_p_{name}'] < DRIFT_P_VALUE:
+            reasons.append(f"{name} PSI {report[f'psi_{name}']:.2f} (KS p={report[f'ks_p_{name}']:.3g})")
+    if len(delta) >= MIN_DRIFT_ROWS and report['unseen_location_share'] > UNSEEN_LOCATION_THRESHOLD:
+        reasons.append(f"{report['unseen_location_share']:.0%} of delta in unseen locations")
+    report['needs_full_retrain'] = bool(reasons)
+    report['reasons'] = reasons
+    return report
+
+
+def train_models(df: pd.DataFrame) -> Dict:
+    """Train LR/RF/XGBoost on an 80/20 split of the listings (notebook 03 and full retrains).
+
+    Returns the model frame, feature matrix/target, fitted encoders/scaler, the
+    split, ``models`` mapping name to
+    (model, test predictions, uses scaler), the comparison table and the best
+    model's name.
+    """
+    df_model = prepare_model_frame(df)
+    le_location = LabelEncoder()
+    le_type = LabelEncoder()
+    le_location.fit(df_model['location'].astype(str))
+    le_type.fit(df_model['property_type'].astype(str))
+    X = encode(df_model, le_location, le_type)
+    y = df_model[TARGET]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    lr = LinearRegression()
+    lr.fit(X_train_scaled, y_train)
+    rf = RandomForestRegressor(n_estimators=200, max_depth=12, min_samples_leaf=5, random_state=42)
+    rf.fit(X_train, y_train)
+    models = {
+        'Linear Regression': (lr, np.clip(lr.predict(X_test_scaled), 0, None), True),
+        'Random Forest': (rf, np.clip(rf.predict(X_test), 0, None), False),
+    }
+    if HAS_XGBOOST:
+        xgb_model = xgb.XGBRegressor(n_estimators=200, max_depth=6, learning_rate=0.1, random_state=42)
+        xgb_model.fit(X_train, y_train)
+        models['XGBoost'] = (xgb_model, np.clip(xgb_model.predict(X_test), 0, None), False)
+
+    comparison_df = pd.DataFrame([
+        {
+            'Model': name,
+            'MAE': mean_absolute_error(y_test, pred),
+            'RMSE': np.sqrt(mean_squared_error(y_test, pred)),
+            'R2': r2_score(y_test, pred),
+        }
+        for name, (_, pred, _) in models.items()
+    ])
+    comparison_df['MAE_KES'] = comparison_df['MAE'].apply(lambda x: f'{x:,.0f}')
+    comparison_df['RMSE_KES'] = comparison_df['RMSE'].apply(lambda x: f'{x:,.0f}')
+
+    return {
+        'df_model': df_model,
+        'X': X,
+        'y': y,
+        'le_location': le_location,
+        'le_type': le_type,
+        'scaler': scaler,
+        'X_train': X_train,
+        'X_test': X_test,
+        'y_train': y_train,
+        'y_test': y_test,
+        'models': models,
+        'comparison_df': comparison_df,
+        'best_model_name': comparison_df.loc[comparison_df['R2'].idxmax(), 'Model'],
+    }
+
+
+def fit_intervals(artifact: Dict, X_cal: pd.DataFrame, y_cal: pd.Series) -> Dict:
+    """Conformal intervals for the artifact's model on rows it was not trained on.
+
+    The calibration rows are kept under ``'calibration'`` so later incremental
+    updates can re-score them with the updated model.
+    """
+    X_pred = artifact['scaler'].transform(X_cal) if artifact.get('use_scaler') and artifact.get('scaler') is not None else X_cal
+    pred = np.clip(artifact['model'].predict(X_pred), 0, None)
+    intervals = fit_conformal(y_cal, pred, X_cal['location_enc'], len(artifact['le_location'].classes_))
+    intervals['calibration'] = {'X': X_cal[FEATURE_COLS].reset_index(drop=True), 'y': np.asarray(y_cal, dtype=float)}
+    return intervals
+
+
+def build_artifact(run: Dict, n_rows: int) -> Dict:
+    """Artifact for data/model.pkl from the best model of a ``train_models`` run"""
+    best_model_name = run['best_model_name']
+    best_model, _, use_scaler = run['models'][best_model_name]
+    artifact = {
+        'model': best_model,
+        'scaler': run['scaler'] if use_scaler else None,
+        'use_scaler': use_scaler,
+        'le_location': run['le_location'],
+        'le_type': run['le_type'],
+        'feature_cols': FEATURE_COLS,
+        'model_name': best_model_name,
+        # Rows of clean_listings.csv seen by this model; incremental refresh trains on rows after this
+        'data_version': {'n_rows': n_rows},
+    }
+    # Split-conformal interval widths calibrated on the held-out test split
+    artifact['intervals'] = fit_intervals(artifact, run['X_test'], run['y_test'])
+    return artifact
+
+
+@telemetry.timed('pipeline_train_seconds', {'mode': 'full'})
+def train_full(df: pd.DataFrame) -> Tuple[Dict, pd.DataFrame]:
+    """Train LR/RF/XGBoost on all listings and return the best artifact and comparison table"""
+    run = train_models(df)
+    logger.info(f"Full retrain on {len(run['df_model'])} rows, best model: {run['best_model_name']}")
+    return build_artifact(run, len(df)), run['comparison_df']
+
+
+def calibrate_intervals(artifact: Dict, df: pd.DataFrame) -> Dict:
+    """Conformal intervals for an artifact saved without them.
+
+    Re-creates the 80/20 split of ``train_models`` over the rows the model was
+    trained on, so the calibration rows are ones the model has not seen as long
+    as those rows are unchanged. Rows with labels the encoders do not know are
+    dropped; the artifact's encoders are left untouched.
+    """
+    n_rows = artifact.get('data_version', {}).get('n_rows', len(df))
+    df_model = prepare_model_frame(df.iloc[:n_rows])
+    # Split before filtering so the test rows are the same as at training time
+    _, df_test = train_test_split(df_model, test_size=0.2, random_state=42)
+    known = (
+        df_test['location'].astype(str).isin(artifact['le_location'].classes_)
+        & df_test['property_type'].astype(str).isin(artifact['le_type'].classes_)
+    )
+    df_test = df_test[known]
+    X_test = encode(df_test, artifact['le_location'], artifact['le_type'])
+    return fit_intervals(artifact, X_test, df_test[TARGET])
+
+
+def _n_extra(n_estimators: int, n_delta: int, n_history: int) -> int:
+    """Number of trees/rounds to add, proportional to the size of the delta"""
+    return max(10, int(round(n_estimators * n_delta / max(n_history, 1))))
+
+
+@telemetry.timed('pipeline_train_seconds', {'mode': 'incremental'})
+def train_incremental(artifact: Dict, delta: pd.DataFrame, n_history: int) -> Dict:
+    """Grow the saved model on the delta rows only and return the updated artifact"""
+    model = artifact['model']
+    df_model = prepare_model_frame(delta)
+    unseen_locations = extend_encoder(artifact['le_location'], df_model['location'])
+    unseen_types = extend_encoder(artifact['le_type'], df_model['property_type'])
+    if unseen_locations:
+        logger.info(f"Added {len(unseen_locations)} new locations: {', '.join(unseen_locations)}")
+    if unseen_types:
+        logger.info(f"Added {len(unseen_types)} new property types: {', '.join(unseen_types)}")
+
+    X = encode(df_model, artifact['le_location'], artifact['le_type'])
+    y = df_model[TARGET]
+    # The updated model no longer matches the old interval calibration. Old calibration
+    # rows are still unseen by it and get re-scored; a large enough delta also holds out a
+    # slice (those rows are trained on at the next full retrain)
+    X_cal = y_cal = None
+    if len(df_model) >= MIN_RECALIBRATION_ROWS:
+        X, X_cal, y, y_cal = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    if isinstance(model, RandomForestRegressor):
+        n_extra = _n_extra(model.n_estimators, len(X), n_history)
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + n_extra)
+        model.fit(X, y)
+        model.set_params(warm_start=False)
+        logger.info(f"Random Forest grew {n_extra} trees on {len(X)} new rows")
+    elif HAS_XGBOOST and isinstance(model, xgb.XGBRegressor):
+        booster = model.get_booster()
+        n_extra = _n_extra(booster.num_boosted_rounds(), len(X), n_history)
+        model.set_params(n_estimators=n_extra)
+        model.fit(X, y, xgb_model=booster)
+        logger.info(f"XGBoost continued {n_extra} boosting rounds on {len(X)} new rows")
+    else:
+        raise ValueError(f"{artifact.get('model_name', type(model).__name__)} does not support incremental training")
+
+    calibration = artifact.get('intervals', {}).get('calibration')
+    if calibration is not None:
+        X_all, y_all = calibration['X'], pd.Series(calibration['y'])
+        if X_cal is not None:
+            X_all = pd.concat([X_all, X_cal[FEATURE_COLS]], ignore_index=True)
+            y_all = pd.concat([y_all, y_cal], ignore_index=True)
+        artifact['intervals'] = fit_intervals(artifact, X_all, y_all)
+        logger.info(f"Recalibrated intervals on {len(X_all)} held-out rows ({0 if X_cal is None else len(X_cal)} from the delta)")
+    elif 'intervals' in artifact:
+        # Calibration rows were not saved with this artifact: consumers fall back until the next full retrain
+        artifact['intervals']['stale'] = True
+    artifact['data_version'] = {'n_rows': n_history + len(delta)}
+    return artifact
+
+
+def refresh(df: pd.DataFrame, artifact: Optional[Dict], force_full: bool = False) -> Tuple[Dict, Optional[pd.DataFrame], Dict]:
+    """Update ``artifact`` with rows of ``df`` it has not seen.
+
+    Returns the new artifact, a fresh comparison table when a full retrain was
+    done (else None), and a report describing what happened.
+    """
+    n_seen = (artifact or {}).get('data_version', {}).get('n_rows')
+    report: Dict = {'n_rows': len(df), 'n_seen': n_seen}
+
+    if artifact is None or n_seen is None or n_seen > len(df) or force_full:
+        report['mode'] = 'full'
+        report['reasons'] = ['forced'] if force_full else ['no usable data version in artifact']
+        artifact, comparison_df = train_full(df)
+        return artifact, comparison_df, report
+
+    delta = df.iloc[n_seen:]
+    if len(prepare_model_frame(delta)) == 0:
+        # Nothing usable (no new rows, or all have missing model features); mark them as seen
+        report['mode'] = 'none'
+        report['n_skipped'] = len(delta)
+        artifact['data_version'] = {'n_rows': len(df)}
+        return artifact, None, report
+
+    history = prepare_model_frame(df.iloc[:n_seen])
+    drift = check_drift(history, prepare_model_frame(delta), artifact['le_location'])
+    report.update(drift)
+    can_warm_start = isinstance(artifact['model'], RandomForestRegressor) or (
+        HAS_XGBOOST and isinstance(artifact['model'], xgb.XGBRegressor)
+    )
+    if drift['needs_full_retrain'] or not can_warm_start:
+        if not can_warm_start:
+            report['reasons'].append(f"{artifact.get('model_name', 'model')} cannot be warm-started")
+        report['mode'] = 'full'
+        artifact, comparison_df = train_full(df)
+        return artifact, comparison_df, report
+
+    report['mode'] = 'incremental'
+    report['n_delta'] = len(delta)
+    return train_incremental(artifact, delta, n_seen), None, report
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    telemetry.configure_from_env()
+    telemetry.start_profiler_from_env()
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data_dir = os.path.join(base_dir, 'data')
+
+    parser = argparse.ArgumentParser(description="Refresh data/model.pkl from new rows in clean_listings.csv")
+    parser.add_argument('--full', action='store_true', help="Force a full retrain")
+    args = parser.parse_args()
+
+    model_path = os.path.join(data_dir, 'model.pkl')
+    df = pd.read_csv(os.path.join(data_dir, 'clean_listings.csv'))
+    artifact = None
+    if os.path.exists(model_path):
+        with open(model_path, 'rb') as f:
+            artifact = pickle.load(f)
+
+    artifact, comparison_df, report = refresh(df, artifact, force_full=args.full)
+    print(f"Refresh mode: {report['mode']}")
+    for reason in report.get('reasons', []):
+        print(f"  - {reason}")
+
+    if report['mode'] != 'none' or report.get('n_skipped'):
+        with open(model_path, 'wb') as f:
+            pickle.dump(artifact, f)
+        print(f"Saved {artifact['model_name']} to {model_path}")
+    if comparison_df is not None:
+        comparison_df.to_csv(os.path.join(data_dir, 'model_comparison.csv'), index=False)
+        print("Saved: data/model_comparison.csv")
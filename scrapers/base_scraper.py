@@ -7,6 +7,7 @@ from abc import ABC, abstractmethod
 import requests
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
+import telemetry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,16 +35,19 @@ class BaseScraper(ABC):
         """Fetch page content with retry logic"""
         for attempt in range(self.max_retries):
             try:
-                response = self.session.get(
-                    url,
-                    headers=self.get_headers(),
-                    timeout=30
-                )
-                response.raise_for_status()
+                with telemetry.timer('scraper_fetch_seconds'):
+                    response = self.session.get(
+                        url,
+                        headers=self.get_headers(),
+                        timeout=30
+                    )
+                    response.raise_for_status()
+                telemetry.inc('scraper_fetch_bytes_total', len(response.content))
                 time.sleep(self.delay)
                 return response.text
             
             except Exception as e:
+                telemetry.inc('scraper_fetch_errors_total')
                 logger.warning(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
                 if attempt == self.max_retries - 1:
                     logger.error(f"Failed to fetch {url} after {self.max_retries} attempts")
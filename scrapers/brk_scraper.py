@@ -7,6 +7,7 @@ import traceback
 from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+import telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +71,108 @@ class BRKScraper(BaseScraper):
                 
         return ', '.join(sorted(found))
 
+    @telemetry.timed('scraper_card_extract_seconds')
+    def _parse_card(self, card) -> Optional[Dict]:
+        """Extract a listing from one card; None if it has no usable price"""
+        # Fallback dictionary
+        listing_data = {
+            'title': 'Unknown',
+            'location': 'Nairobi',
+            'price_kes': 0,
+            'bedrooms': 0,
+            'bathrooms': 0,
+            'size_sqft': 0.0,
+            'property_type': 'House',
+            'source': 'BuyRentKenya'
+        }
+        
+        try:
+            # BRK makes it easy: details are heavily structured in links/spans
+            text_parts = [t.strip() for t in card.get_text(separator='|').split('|') if t.strip()]
+            full_text = ' '.join(text_parts)
+            
+            # Usually price has KSh
+            price_tags = [t for t in text_parts if 'KSh' in t]
+            if price_tags:
+                price = self._parse_price(price_tags[0])
+                if price:
+                    listing_data['price_kes'] = price
+
+            # Bedrooms (e.g. "3 Bedrooms" or "3 Bed")
+            bed_match = re.search(r'(\d+)\s*(Bed|Bedroom)', full_text, re.IGNORECASE)
+            if bed_match:
+                listing_data['bedrooms'] = int(bed_match.group(1))
+
+            # Bathrooms (e.g. "2 Bathrooms" or "2 Bath")
+            bath_match = re.search(r'(\d+)\s*(Bath|Bathroom)', full_text, re.IGNORECASE)
+            if bath_match:
+                listing_data['bathrooms'] = int(bath_match.group(1))
+
+            # Size (e.g. "158 m²")
+            size_match = re.search(r'([\d,]+)\s*m²', full_text, re.IGNORECASE)
+            if size_match:
+                listing_data['size_sqft'] = self._parse_size(size_match.group(0))
+
+            # Try to find a location by checking for the common pattern: "Title | Location | Bedrooms"
+            # We can iterate through text parts backwards to find something before Bedrooms
+            try:
+                bedrooms_index = next(i for i, part in enumerate(text_parts) if 'Bedroom' in part and len(part) < 20)
+                if bedrooms_index > 0:
+                    loc_candidate = text_parts[bedrooms_index - 1]
+                    if loc_candidate and len(loc_candidate) < 50:
+                        listing_data['location'] = loc_candidate
+            except StopIteration:
+                pass
+                
+            # Basic property type inference based on text
+            l_text = full_text.lower()
+            if 'townhouse' in l_text:
+                listing_data['property_type'] = 'Townhouse'
+            elif 'villa' in l_text:
+                listing_data['property_type'] = 'Villa'
+            elif 'bungalow' in l_text:
+                listing_data['property_type'] = 'Bungalow'
+            elif 'apartment' in l_text:
+                listing_data['property_type'] = 'Apartment'
+            elif 'house' in l_text:
+                listing_data['property_type'] = 'House'
+
+            # Extract amenities from text
+            listing_data['amenities'] = self._extract_amenities(full_text)
+
+            if listing_data['price_kes'] > 0:
+                return listing_data
+            return None
+
+        except Exception as e:
+            telemetry.inc('scraper_card_errors_total')
+            logger.debug(f"Error parsing listing card: {e}")
+            traceback.print_exc()
+            return None
+
+    def _find_listing_cards(self, html: str) -> list:
+        """Parse HTML and return the listing card elements"""
+        with telemetry.timer('scraper_parse_seconds'):
+            soup = BeautifulSoup(html, 'html.parser')
+
+            # Find listing cards
+            listing_cards = soup.find_all('div', class_=lambda c: c and 'listing-card' in c.lower())
+        telemetry.inc('scraper_cards_total', len(listing_cards))
+        return listing_cards
+
+    def _parse_cards(self, listing_cards: list) -> List[Dict]:
+        """Extract listings from card elements, skipping cards without a price"""
+        listings = []
+        for card in listing_cards:
+            listing_data = self._parse_card(card)
+            if listing_data is not None:
+                listings.append(listing_data)
+        return listings
+
+    def parse_page(self, html: str) -> List[Dict]:
+        """Extract all listings from one results page of HTML"""
+        return self._parse_cards(self._find_listing_cards(html))
+
     def scrape_listings(self, max_pages: int = 10) -> List[Dict]:
         """Scrape properties up to max_pages"""
         all_listings = []
@@ -85,95 +188,22 @@ class BRKScraper(BaseScraper):
                 logger.warning(f"Failed to fetch page {page}, stopping.")
                 break
                 
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Find listing cards
-            listing_cards = soup.find_all('div', class_=lambda c: c and 'listing-card' in c.lower())
+            listing_cards = self._find_listing_cards(html)
             
             if not listing_cards:
                 logger.info(f"No listings found on page {page}, ending pagination.")
                 break
                 
-            for card in listing_cards:
-                # Fallback dictionary
-                listing_data = {
-                    'title': 'Unknown',
-                    'location': 'Nairobi',
-                    'price_kes': 0,
-                    'bedrooms': 0,
-                    'bathrooms': 0,
-                    'size_sqft': 0.0,
-                    'property_type': 'House',
-                    'source': 'BuyRentKenya'
-                }
-                
-                try:
-                    # BRK makes it easy: details are heavily structured in links/spans
-                    text_parts = [t.strip() for t in card.get_text(separator='|').split('|') if t.strip()]
-                    full_text = ' '.join(text_parts)
-                    
-                    # Usually price has KSh
-                    price_tags = [t for t in text_parts if 'KSh' in t]
-                    if price_tags:
-                        price = self._parse_price(price_tags[0])
-                        if price:
-                            listing_data['price_kes'] = price
-
-                    # Bedrooms (e.g. "3 Bedrooms" or "3 Bed")
-                    bed_match = re.search(r'(\d+)\s*(Bed|Bedroom)', full_text, re.IGNORECASE)
-                    if bed_match:
-                        listing_data['bedrooms'] = int(bed_match.group(1))
-
-                    # Bathrooms (e.g. "2 Bathrooms" or "2 Bath")
-                    bath_match = re.search(r'(\d+)\s*(Bath|Bathroom)', full_text, re.IGNORECASE)
-                    if bath_match:
-                        listing_data['bathrooms'] = int(bath_match.group(1))
-
-                    # Size (e.g. "158 m²")
-                    size_match = re.search(r'([\d,]+)\s*m²', full_text, re.IGNORECASE)
-                    if size_match:
-                        listing_data['size_sqft'] = self._parse_size(size_match.group(0))
-
-                    # Try to find a location by checking for the common pattern: "Title | Location | Bedrooms"
-                    # We can iterate through text parts backwards to find something before Bedrooms
-                    try:
-                        bedrooms_index = next(i for i, part in enumerate(text_parts) if 'Bedroom' in part and len(part) < 20)
-                        if bedrooms_index > 0:
-                            loc_candidate = text_parts[bedrooms_index - 1]
-                            if loc_candidate and len(loc_candidate) < 50:
-                                listing_data['location'] = loc_candidate
-                    except StopIteration:
-                        pass
-                        
-                    # Basic property type inference based on text
-                    l_text = full_text.lower()
-                    if 'townhouse' in l_text:
-                        listing_data['property_type'] = 'Townhouse'
-                    elif 'villa' in l_text:
-                        listing_data['property_type'] = 'Villa'
-                    elif 'bungalow' in l_text:
-                        listing_data['property_type'] = 'Bungalow'
-                    elif 'apartment' in l_text:
-                        listing_data['property_type'] = 'Apartment'
-                    elif 'house' in l_text:
-                        listing_data['property_type'] = 'House'
-
-                    # Extract amenities from text
-                    listing_data['amenities'] = self._extract_amenities(full_text)
-
-                    if listing_data['price_kes'] > 0:
-                        all_listings.append(listing_data)
-                        
-                except Exception as e:
-                    logger.debug(f"Error parsing listing card: {e}")
-                    traceback.print_exc()
-                    continue
-                    
+            all_listings.extend(self._parse_cards(listing_cards))
+
         return all_listings
 
 if __name__ == "__main__":
     import os
     from datetime import datetime
+
+    telemetry.configure_from_env()
+    telemetry.start_profiler_from_env()
     
     # Ensure data directory exists
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
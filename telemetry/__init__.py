@@ -0,0 +1,11 @@
+"""Nairobi House Price Prediction - Hot-path metrics and profiling"""
+from .metrics import (
+    REGISTRY, configure_from_env, disable, enable, enabled, inc, observe,
+    start_http_server, timed, timer, write_jsonl,
+)
+from .profiler import SamplingProfiler, start_from_env as start_profiler_from_env
+__all__ = [
+    'REGISTRY', 'configure_from_env', 'disable', 'enable', 'enabled', 'inc', 'observe',
+    'start_http_server', 'timed', 'timer', 'write_jsonl',
+    'SamplingProfiler', 'start_profiler_from_env',
+]
@@ -0,0 +1,334 @@
+"""Low-overhead timers, counters and histograms with Prometheus/JSONL export.
+
+Metrics are off unless ``METRICS_ENABLED=1`` is set in the environment (or
+``enable()`` is called). While disabled, ``timer()`` returns a shared no-op
+context manager and ``timed`` returns the decorated function unchanged, so
+instrumented code pays nothing.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds: 100us .. ~100s, roughly x2.5 apart
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# HELP text for the metrics recorded across the project; others get their name
+HELP: Dict[str, str] = {
+    'scraper_fetch_seconds': 'HTTP fetch time per listings page',
+    'scraper_fetch_bytes_total': 'Bytes downloaded by the scraper',
+    'scraper_fetch_errors_total': 'Failed scraper fetch attempts',
+    'scraper_parse_seconds': 'Time to parse one listings page',
+    'scraper_card_extract_seconds': 'Time to extract one listing card',
+    'scraper_cards_total': 'Listing cards found',
+    'scraper_card_errors_total': 'Listing cards that failed to parse',
+    'pipeline_stage_seconds': 'Cleaning pipeline stage time',
+    'pipeline_train_seconds': 'Model training time',
+    'model_predict_seconds': 'Model prediction time',
+    'comparables_build_seconds': 'Comparables index build time',
+    'comparables_sync_seconds': 'Comparables index sync time',
+    'comparables_query_seconds': 'Comparables query time',
+    'app_cache_lookup_seconds': 'Streamlit cache lookup time',
+    'app_cache_misses_total': 'Streamlit cache misses',
+    'app_data_load_seconds': 'Data file load time',
+    'app_aggregate_seconds': 'Dashboard aggregate time',
+    'app_render_seconds': 'Chart render time',
+}
+
+
+def _truthy(value: Optional[str]) -> bool:
+    return (value or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _escape(value: str, quote: bool = True) -> str:
+    """Escape backslashes, newlines and (in label values) double quotes"""
+    value = value.replace('\\', '\\\\').replace('\n', '\\n')
+    return value.replace('"', '\\"') if quote else value
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+def _family_header(lines: List[str], name: str, kind: str) -> None:
+    lines.append(f'# HELP {name} {_escape(HELP.get(name, name), quote=False)}')
+    lines.append(f'# TYPE {name} {kind}')
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile (upper bound of the bucket holding it)"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class Registry:
+    """Process-wide store of counters and histograms.
+
+    Only creating a new series takes the lock; updates to an existing
+    histogram rely on the GIL, which keeps hot-path timers cheap at the cost of
+    a rare lost increment under heavy thread contention.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def inc(self, name: str, value: float = 1.0, labels: Labels = ()) -> None:
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def histogram(self, name: str, labels: Labels = ()) -> Histogram:
+        key = (name, labels)
+        hist = self.histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(key, Histogram())
+        return hist
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        self.histogram(name, labels).observe(value)
+
+    def reset(self) -> None:
+        """Zero all series in place (decorated functions keep their histogram)"""
+        with self._lock:
+            self.counters.clear()
+            for hist in self.histograms.values():
+                hist.counts = [0] * len(hist.counts)
+                hist.count = 0
+                hist.sum = 0.0
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            previous = None
+            for (name, labels), value in sorted(self.counters.items()):
+                if name != previous:
+                    _family_header(lines, name, 'counter')
+                    previous = name
+                lines.append(f'{name}{_format_labels(labels)} {value:g}')
+            for (name, labels), hist in sorted(self.histograms.items(), key=lambda kv: kv[0]):
+                if name != previous:
+                    _family_header(lines, name, 'histogram')
+                    previous = name
+                running = 0
+                for bound, c in zip(hist.buckets, hist.counts):
+                    running += c
+                    lines.append(f'{name}_bucket{_format_labels(labels, ("le", f"{bound:g}"))} {running}')
+                lines.append(f'{name}_bucket{_format_labels(labels, ("le", "+Inf"))} {hist.count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {hist.sum:.9g}')
+                lines.append(f'{name}_count{_format_labels(labels)} {hist.count}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict:
+        """Summary of all metrics as plain JSON-serialisable data"""
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    {
+                        'name': name,
+                        'labels': dict(labels),
+                        'count': hist.count,
+                        'sum': hist.sum,
+                        'p50': hist.quantile(0.5),
+                        'p95': hist.quantile(0.95),
+                        'p99': hist.quantile(0.99),
+                        'buckets': dict(zip([f'{b:g}' for b in hist.buckets] + ['+Inf'], hist.counts)),
+                    }
+                    for (name, labels), hist in self.histograms.items()
+                ],
+            }
+
+
+REGISTRY = Registry()
+_enabled = _truthy(os.environ.get('METRICS_ENABLED'))
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    """Turn metrics on at runtime (functions already decorated with ``timed`` stay uninstrumented)"""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+
+def inc(name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None) -> None:
+    """Increment a counter"""
+    if _enabled:
+        REGISTRY.inc(name, value, _labels(labels))
+
+
+def observe(name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+    """Record a value in a histogram"""
+    if _enabled:
+        REGISTRY.observe(name, value, _labels(labels))
+
+
+class _Timer:
+    __slots__ = ('hist', 'start')
+
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.hist.observe(perf_counter() - self.start)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def timer(name: str, labels: Optional[Dict[str, str]] = None):
+    """Context manager recording elapsed seconds into histogram ``name``"""
+    if not _enabled:
+        return _NOOP_TIMER
+    return _Timer(REGISTRY.histogram(name, _labels(labels)))
+
+
+def timed(name: str, labels: Optional[Dict[str, str]] = None):
+    """Decorator form of ``timer``; a no-op when metrics are disabled at import time"""
+    def decorator(func):
+        if not _enabled:
+            return func
+        hist = REGISTRY.histogram(name, _labels(labels))
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                hist.observe(perf_counter() - start)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorator
+
+
+def write_jsonl(path: str) -> None:
+    """Append a snapshot of all metrics as one JSON line"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(REGISTRY.snapshot()) + '\n')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[HTTPServer] = None
+
+
+def start_http_server(port: int, host: str = '127.0.0.1') -> Optional[HTTPServer]:
+    """Serve metrics in Prometheus text format on a background thread"""
+    global _server
+    if _server is not None:
+        return _server
+    try:
+        _server = HTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Could not start metrics endpoint on {host}:{port}: {e}")
+        return None
+    threading.Thread(target=_server.serve_forever, name='metrics-http', daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return _server
+
+
+_configured = False
+
+
+def configure_from_env() -> None:
+    """Start exporters requested via METRICS_PORT / METRICS_JSONL (idempotent)"""
+    global _configured
+    if _configured or not _enabled:
+        return
+    _configured = True
+    port = os.environ.get('METRICS_PORT')
+    if port:
+        start_http_server(int(port))
+    jsonl_path = os.environ.get('METRICS_JSONL')
+    if jsonl_path:
+        atexit.register(write_jsonl, jsonl_path)
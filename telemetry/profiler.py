@@ -0,0 +1,81 @@
+"""Opt-in sampling profiler writing folded stacks (flamegraph.pl / speedscope format).
+
+Enable with ``METRICS_PROFILE=<output path>``; ``METRICS_PROFILE_INTERVAL_MS``
+sets the sampling period (default 10 ms). A background thread samples the
+stacks of all other threads, so profiled code is not modified.
+"""
+
+import atexit
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """Periodically samples Python stacks of all threads"""
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> 'SamplingProfiler':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write_folded(self, path: str) -> None:
+        """Write ``stack count`` lines, one per distinct stack"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f'{stack} {count}\n')
+        logger.info(f"Wrote {sum(self.samples.values())} profile samples to {path}")
+
+
+_profiler: Optional[SamplingProfiler] = None
+
+
+def start_from_env() -> Optional[SamplingProfiler]:
+    """Start the profiler if METRICS_PROFILE is set; dump results at exit"""
+    global _profiler
+    path = os.environ.get('METRICS_PROFILE')
+    if not path or _profiler is not None:
+        return _profiler
+    interval = float(os.environ.get('METRICS_PROFILE_INTERVAL_MS', '10')) / 1000
+    _profiler = SamplingProfiler(interval=interval).start()
+
+    def _dump():
+        _profiler.stop()
+        _profiler.write_folded(path)
+    atexit.register(_dump)
+    return _profiler
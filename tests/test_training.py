@@ -0,0 +1,21 @@
+import os
+
+import pandas as pd
+
+from pricing.training import refresh
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'clean_listings.csv')
+
+
+def test_small_iid_delta_refreshes_incrementally():
+    df = pd.read_csv(DATA_PATH).sample(frac=1, random_state=0).reset_index(drop=True)
+    history, n_delta = df.iloc[:-20], 20
+
+    artifact, _, report = refresh(history, None)
+    assert report['mode'] == 'full'
+
+    artifact, comparison_df, report = refresh(df, artifact)
+    assert report['mode'] == 'incremental', report.get('reasons')
+    assert report['n_delta'] == n_delta
+    assert comparison_df is None
+    assert artifact['data_version'] == {'n_rows': len(df)}